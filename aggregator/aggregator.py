@@ -1,13 +1,18 @@
 import asyncio
 import logging
 import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 import cbor2
+import orjson
 import numpy as np
-from .fixed_point import to_fixed, matvec_fixed, add_sat
+from .fixed_point import Q_BITS, Q15_BITS, to_fixed_vec, fixed_to_q15, finalize
 from .coding import RatelessCoder
-from .cbor_schemas import pack_task, pack_proposed_state
+from .cbor_schemas import pack_task, pack_vec, pack_proposed_state, wire_dtype, COEFF_DTYPE
 from .poa_gate import PoAGate
+from .batch_io import BatchSender, BatchReceiver
+from .state_shm import ProposedStateWriter, SHM_NAME
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s | AGG | %(message)s')
 
@@ -22,21 +27,51 @@ class Aggregator(asyncio.DatagramProtocol):
         self.N = self.cfg['system']['N']
         self.R = self.cfg['system']['R']
         self.worker_base_port = self.cfg['transport']['worker_port_start']
-        self.x_curr = [to_fixed(x) for x in self.mat['x0']]
-        self.u = [to_fixed(u) for u in self.mat['u']]
-        self.B_fixed = [[to_fixed(val) for val in row] for row in self.mat['B']]
+        self.x_curr = to_fixed_vec(self.mat['x0'])
+        self.u = to_fixed_vec(self.mat['u'])
+        self.B_fixed = to_fixed_vec(self.mat['B'])
         self.seq = 0
-        self.coder = RatelessCoder(self.mat['A'], self.R)
+        # State stays Q1.31; with scale_bits <= 15 the workers compute in Q15.
+        self.scale_bits = self.mat.get('scale_bits', Q_BITS)
+        self.q15 = self.scale_bits <= Q15_BITS
+        self.wire_dtype = wire_dtype(self.scale_bits)
+        self.coder = RatelessCoder(self.mat['A'], self.R,
+                                   self.cfg.get('coding', {}).get('gpu_min_rows'),
+                                   self.scale_bits)
         self.poa = PoAGate("authorized_keys.txt")
-        self.results_buffer = []
+        self.results_buffer = {}
+        self.results_event = asyncio.Event()
         self.cycle_start_ts = 0
         self.transport = None
+        self.sock = None
+        self.sender = BatchSender(self.N)
+        self.receiver = BatchReceiver()
+        self.encode_pool = ThreadPoolExecutor(max_workers=min(self.N, os.cpu_count()))
         self.next_state_buffer = None
+        op_cfg = self.cfg.get('operator', {})
+        self.debug_state_file = op_cfg.get('debug_state_file', False)
+        self.state_shm = None
+        self.state_shm_name = op_cfg.get('state_shm', SHM_NAME)
 
     def connection_made(self, transport):
         self.transport = transport
+        self.sock = transport.get_extra_info('socket')
+        self.state_shm = ProposedStateWriter(self.x_curr.size, self.state_shm_name)
+
+    def connection_lost(self, exc):
+        self.encode_pool.shutdown(wait=False)
+        if self.state_shm is not None:
+            self.state_shm.close()
+            self.state_shm = None
 
     def datagram_received(self, data, addr):
+        self.dispatch(data)
+        # Drain whatever else is already queued with one recvmmsg instead of one callback each.
+        if self.sock is not None:
+            for view, _ in self.receiver.recv(self.sock):
+                self.dispatch(view)
+
+    def dispatch(self, data):
         try:
             msg = cbor2.loads(data)
             if msg['t'] == 'RES':
@@ -48,11 +83,15 @@ class Aggregator(asyncio.DatagramProtocol):
 
     def handle_result(self, msg):
         if msg['seq'] != self.seq: return
-        self.results_buffer.append((msg['c'], msg['y']))
+        # Keyed by worker so retransmitted duplicates cannot make the decode subset rank-deficient.
+        self.results_buffer[msg['w']] = (np.frombuffer(msg['c'], dtype=COEFF_DTYPE),
+                                         np.frombuffer(msg['y'], dtype=self.wire_dtype))
+        if len(self.results_buffer) >= self.R:
+            self.results_event.set()
 
     def handle_commit(self, msg):
         if msg['seq'] != self.seq: return
-        is_valid = self.poa.verify(str(self.seq).encode(), msg['sig'], msg['pk'])
+        is_valid = self.poa.verify(self.seq.to_bytes(8, 'big'), msg['sig'], msg['pk'])
         if is_valid:
             self.commit_and_advance()
         else:
@@ -60,27 +99,50 @@ class Aggregator(asyncio.DatagramProtocol):
 
     async def run_cycle(self):
         self.seq += 1
-        self.results_buffer = []
+        self.results_buffer = {}
+        self.results_event.clear()
         self.cycle_start_ts = time.time()
         logging.info(f"--- Starting Cycle {self.seq} ---")
-        for i in range(self.N):
-            coeffs, coded_row_block = self.coder.generate_task(self.x_curr)
-            payload = pack_task(self.seq, i, coeffs, self.x_curr, coded_row_block)
-            self.transport.sendto(payload, ('127.0.0.1', self.worker_base_port + i))
-        while len(self.results_buffer) < self.R:
-            if (time.time() - self.cycle_start_ts) > 0.5:
-                logging.error("Cycle Timeout - Stragglers detected")
-                return
-            await asyncio.sleep(0.005)
-        Ax_next = self.coder.decode(self.results_buffer)
-        Bu = matvec_fixed(self.B_fixed, self.u)
-        x_next_candidate = [add_sat(a, b) for a, b in zip(Ax_next, Bu)]
-        logging.info(f"Proposed State: {[x/2**31 for x in x_next_candidate]}")
-        with open("proposed_state.json", "w") as f:
-            json.dump({"seq": self.seq, "x": x_next_candidate}, f)
+        loop = asyncio.get_running_loop()
+        x_wire = fixed_to_q15(self.x_curr) if self.q15 else self.x_curr
+        x_bytes = pack_vec(x_wire, self.wire_dtype)
+        tasks = [self.coder.generate_task(self.x_curr) for _ in range(self.N)]
+        # Encode the N independent TASK payloads in parallel, then send them in one batch.
+        payloads = await asyncio.gather(*(
+            loop.run_in_executor(self.encode_pool, pack_task, self.seq, i, coeffs, x_bytes, block,
+                                 self.scale_bits)
+            for i, (coeffs, block) in enumerate(tasks)
+        ))
+        addrs = [('127.0.0.1', self.worker_base_port + i) for i in range(self.N)]
+        self.fan_out(payloads, addrs)
+        remaining = 0.5 - (time.time() - self.cycle_start_ts)
+        try:
+            await asyncio.wait_for(self.results_event.wait(), timeout=max(remaining, 0.0))
+        except asyncio.TimeoutError:
+            logging.error("Cycle Timeout - Stragglers detected")
+            return
+        decoded_chunks = self.coder.solve(list(self.results_buffer.values()))
+        if decoded_chunks is None:
+            logging.error("Decode failed - singular coefficient subset")
+            return
+        if self.q15:
+            decoded_chunks = decoded_chunks * (1 << (Q_BITS - Q15_BITS))
+        x_next_candidate = finalize(decoded_chunks, self.B_fixed, self.u, self.coder.rows)
+        logging.info(f"Proposed State: {(x_next_candidate / 2**31).tolist()}")
+        self.state_shm.publish(self.seq, x_next_candidate)
+        if self.debug_state_file:
+            with open("proposed_state.json", "wb") as f:
+                f.write(orjson.dumps({"seq": self.seq, "x": x_next_candidate},
+                                     option=orjson.OPT_SERIALIZE_NUMPY))
         self.next_state_buffer = x_next_candidate
         # Wait for COMMIT message from operator_cli.py
 
+    def fan_out(self, payloads, addrs):
+        # One sendmmsg for the whole batch; anything it did not take goes via the transport.
+        sent = self.sender.send(self.sock, payloads, addrs) if self.sock is not None else 0
+        for payload, addr in zip(payloads[sent:], addrs[sent:]):
+            self.transport.sendto(payload, addr)
+
     def commit_and_advance(self):
         self.x_curr = self.next_state_buffer
         logging.info(f"Cycle {self.seq} COMMITTED. T_cycle: {(time.time()-self.cycle_start_ts)*1000:.2f}ms")
@@ -0,0 +1,116 @@
+"""
+Batched UDP I/O via Linux sendmmsg(2)/recvmmsg(2).
+One syscall moves a whole fan-out or drains a whole receive queue; callers
+fall back to per-datagram I/O when the calls are unavailable.
+"""
+import ctypes
+import socket
+import sys
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_sendmmsg = getattr(_libc, "sendmmsg", None)
+_recvmmsg = getattr(_libc, "recvmmsg", None)
+
+class _iovec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+class _sockaddr_in(ctypes.Structure):
+    _fields_ = [("sin_family", ctypes.c_ushort), ("sin_port", ctypes.c_uint16),
+                ("sin_addr", ctypes.c_uint32), ("sin_zero", ctypes.c_uint8 * 8)]
+
+class _msghdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.POINTER(_iovec)), ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+class _mmsghdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _msghdr), ("msg_len", ctypes.c_uint)]
+
+if _sendmmsg is not None:
+    _sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint, ctypes.c_int]
+    _sendmmsg.restype = ctypes.c_int
+if _recvmmsg is not None:
+    _recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_mmsghdr), ctypes.c_uint, ctypes.c_int,
+                          ctypes.c_void_p]
+    _recvmmsg.restype = ctypes.c_int
+
+_NAMELEN = ctypes.sizeof(_sockaddr_in)
+_MSG_DONTWAIT = int(socket.MSG_DONTWAIT)
+
+class _MsgVec:
+    """Preallocated mmsghdr/iovec/sockaddr arrays for up to `capacity` datagrams."""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.msgs = (_mmsghdr * capacity)()
+        self.iovs = (_iovec * capacity)()
+        self.names = (_sockaddr_in * capacity)()
+        for i in range(capacity):
+            hdr = self.msgs[i].msg_hdr
+            hdr.msg_name = ctypes.addressof(self.names[i])
+            hdr.msg_namelen = ctypes.sizeof(_sockaddr_in)
+            hdr.msg_iov = ctypes.pointer(self.iovs[i])
+            hdr.msg_iovlen = 1
+        self._sock = None
+        self._sock_ok = False
+
+    def _usable(self, sock, call):
+        # Reading sock.family costs an enum conversion, so check each socket once.
+        if sock is not self._sock:
+            self._sock = sock
+            self._sock_ok = call is not None and sock.family == socket.AF_INET
+        return self._sock_ok
+
+class BatchSender(_MsgVec):
+
+    def send(self, sock, payloads, addrs):
+        """Send as many (payload, addr) pairs as possible; returns the count sent."""
+        if not self._usable(sock, _sendmmsg):
+            return 0
+        n = min(len(payloads), self.capacity)
+        # Keep the char buffers alive until sendmmsg returns.
+        bufs = [ctypes.c_char_p(p) for p in payloads[:n]]
+        for i in range(n):
+            host, port = addrs[i]
+            name = self.names[i]
+            name.sin_family = socket.AF_INET
+            name.sin_port = socket.htons(port)
+            name.sin_addr = int.from_bytes(socket.inet_aton(host), sys.byteorder)
+            self.iovs[i].iov_base = ctypes.cast(bufs[i], ctypes.c_void_p)
+            self.iovs[i].iov_len = len(payloads[i])
+        sent = _sendmmsg(sock.fileno(), self.msgs, n, 0)
+        return max(sent, 0)
+
+class BatchReceiver(_MsgVec):
+    """recvmmsg into a fixed pool of receive slots that is reused across calls."""
+    def __init__(self, capacity=32, slot_size=65536):
+        super().__init__(capacity)
+        self.slot_size = slot_size
+        self.slots = [ctypes.create_string_buffer(slot_size) for _ in range(capacity)]
+        self.views = [memoryview(slot).cast('B') for slot in self.slots]
+        self.hdrs = [m.msg_hdr for m in self.msgs]
+        for i, slot in enumerate(self.slots):
+            self.iovs[i].iov_base = ctypes.addressof(slot)
+            self.iovs[i].iov_len = slot_size
+        # The kernel only rewrites msg_namelen of filled slots, so only those need re-arming.
+        self._filled = 0
+
+    def recv(self, sock):
+        """Drain queued datagrams without blocking.
+
+        Returns (view, addr) pairs; each view aliases a pool slot and is only
+        valid until the next call.
+        """
+        if not self._usable(sock, _recvmmsg):
+            return []
+        for hdr in self.hdrs[:self._filled]:
+            hdr.msg_namelen = _NAMELEN
+        n = max(_recvmmsg(sock.fileno(), self.msgs, self.capacity, _MSG_DONTWAIT, None), 0)
+        self._filled = n
+        out = []
+        for i in range(n):
+            name = self.names[i]
+            addr = (socket.inet_ntoa(name.sin_addr.to_bytes(4, sys.byteorder)),
+                    socket.ntohs(name.sin_port))
+            out.append((self.views[i][:self.msgs[i].msg_len], addr))
+        return out
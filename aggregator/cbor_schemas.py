@@ -1,18 +1,129 @@
+import io
+import struct
+import threading
+import types
 import cbor2
+import numpy as np
 import time
+from .fixed_point import Q_BITS, Q15_BITS
 
-def pack_task(seq, tid, coeffs, x_fixed, coded_matrix=None):
-    task = {
-        "t": "TASK",
-        "seq": seq,
-        "tid": tid,
-        "c": coeffs,
-        "x": x_fixed,
-        "ts": time.time_ns()
-    }
+def require_cbor2_c():
+    """Refuse to run on cbor2's pure-Python fallback, which is several times slower per packet."""
+    if not isinstance(cbor2.dumps, types.BuiltinFunctionType):
+        raise ImportError("cbor2 is running without its C extension; reinstall cbor2 with a C compiler available")
+
+require_cbor2_c()
+
+# TASK maps always carry the same keys in the same order, so the map header
+# and key strings are encoded once and only the values are encoded per task.
+_TASK_KEYS = ("seq", "tid", "c", "x", "ts", "M", "rows", "cols", "sb")
+_TASK_HDR = cbor2.dumps({"t": "TASK"})[1:]
+_TASK_K = {k: cbor2.dumps(k) for k in _TASK_KEYS}
+
+def _map_header(n_entries):
+    return bytes([0xa0 | n_entries])  # CBOR major type 5, short length
+
+_TASK_PREFIX = _map_header(6) + _TASK_HDR
+_TASK_PREFIX_M = _map_header(9) + _TASK_HDR
+_TASK_PREFIX_Q15 = _map_header(10) + _TASK_HDR
+
+# Vectors travel as flat byte strings rather than CBOR arrays: x, M (row-major,
+# with rows/cols alongside) and y as little-endian int64, the coding coefficients
+# c as uint8. Receivers np.frombuffer them, and neither side pays cbor2's
+# per-container and per-element cost. Q15 tasks (scale_bits <= 15, flagged by
+# an "sb" entry) carry x, M and y as int16 instead.
+WIRE_DTYPE = np.dtype("<i8")
+WIRE_DTYPE_Q15 = np.dtype("<i2")
+COEFF_DTYPE = np.dtype("u1")
+
+def wire_dtype(scale_bits):
+    return WIRE_DTYPE_Q15 if scale_bits <= Q15_BITS else WIRE_DTYPE
+
+def pack_vec(arr, dtype=WIRE_DTYPE):
+    return np.ascontiguousarray(arr, dtype=dtype).tobytes()
+
+def pack_ints(values):
+    """pack_vec for a short list of Python ints, skipping the NumPy round trip."""
+    return struct.pack(f"<{len(values)}q", *values)
+
+def pack_coeffs(coeffs):
+    return np.ascontiguousarray(coeffs, dtype=COEFF_DTYPE).tobytes()
+
+def _bytes_header(n):
+    # CBOR major type 2 (byte string) header for a payload of n bytes.
+    if n < 24:
+        return bytes([0x40 | n])
+    if n < 0x100:
+        return bytes([0x58, n])
+    if n < 0x10000:
+        return b"\x59" + n.to_bytes(2, "big")
+    return b"\x5a" + n.to_bytes(4, "big")
+
+# pack_task runs on the aggregator's encode pool, so each thread reuses its own buffer/encoder.
+_local = threading.local()
+
+def _task_encoder():
+    enc = getattr(_local, "enc", None)
+    if enc is None:
+        _local.buf = io.BytesIO()
+        enc = _local.enc = cbor2.CBOREncoder(_local.buf)
+    _local.buf.seek(0)
+    _local.buf.truncate()
+    return _local.buf, enc
+
+def pack_task(seq, tid, coeffs, x_fixed, coded_matrix=None, scale_bits=Q_BITS):
+    """x_fixed may be an array or bytes already produced by pack_vec (shared across tasks).
+
+    With scale_bits <= 15, x and M are Q15 and packed as int16; such tasks must carry M.
+    """
+    q15 = scale_bits <= Q15_BITS
+    if q15 and coded_matrix is None:
+        raise ValueError("Q15 tasks must carry a coded matrix")
+    dtype = wire_dtype(scale_bits)
+    buf, enc = _task_encoder()
+    buf.write(_TASK_PREFIX_Q15 if q15 else _TASK_PREFIX if coded_matrix is None else _TASK_PREFIX_M)
+    x_bytes = x_fixed if isinstance(x_fixed, bytes) else pack_vec(x_fixed, dtype)
+    fields = [("seq", seq), ("tid", tid), ("c", pack_coeffs(coeffs)), ("x", x_bytes),
+              ("ts", time.time_ns())]
     if coded_matrix is not None:
-        task["M"] = coded_matrix
-    return cbor2.dumps(task)
+        M = np.asarray(coded_matrix)
+        rows, cols = M.shape
+        fields += [("M", pack_vec(M, dtype)), ("rows", rows), ("cols", cols)]
+    if q15:
+        fields.append(("sb", scale_bits))
+    for key, value in fields:
+        buf.write(_TASK_K[key])
+        enc.encode(value)
+    return buf.getvalue()
+
+class ResultEncoder:
+    """Encodes one worker's RES responses {t, seq, tid, w, y, c} from a fixed prefix.
+
+    Everything up to the "y" key is preformatted once; seq and tid use
+    fixed-width 8-byte CBOR uints so they sit at stable offsets and are patched
+    in place. y and c are already-packed byte strings (pack_vec/pack_ints and
+    the TASK's c), so the rest is two byte-string headers and a join; the
+    encoded c item comes out byte-identical to the one in the TASK.
+    Not thread-safe: use one instance per worker.
+    """
+    def __init__(self, worker_id):
+        head = bytearray(_map_header(6) + cbor2.dumps("t") + cbor2.dumps("RES"))
+        head += cbor2.dumps("seq") + b"\x1b"
+        self._seq_off = len(head)
+        head += bytes(8)
+        head += cbor2.dumps("tid") + b"\x1b"
+        self._tid_off = len(head)
+        head += bytes(8)
+        head += cbor2.dumps("w") + cbor2.dumps(worker_id) + cbor2.dumps("y")
+        self._head = head
+        self._c_key = cbor2.dumps("c")
+
+    def encode(self, seq, tid, y_bytes, c_bytes):
+        head = self._head
+        struct.pack_into(">Q", head, self._seq_off, seq)
+        struct.pack_into(">Q", head, self._tid_off, tid)
+        return b"".join((head, _bytes_header(len(y_bytes)), y_bytes,
+                         self._c_key, _bytes_header(len(c_bytes)), c_bytes))
 
 def pack_result(seq, tid, worker_id, y_fixed):
     return cbor2.dumps({
@@ -1,11 +1,37 @@
+import warnings
+from functools import lru_cache
 import numpy as np
-from .fixed_point import to_fixed
+from scipy.linalg import LinAlgWarning, lu_factor, lu_solve
+from .fixed_point import Q_BITS, Q15_BITS, to_fixed_vec, to_fixed_q15_vec
+
+try:
+    import cupy as cp
+except ImportError:  # CuPy is optional; coding stays on the CPU without it.
+    cp = None
 
 PRIME = 65521
+# float64 bounds that round-trip through int64; 2**63 - 1 itself is not representable.
+INT64_MIN_F = -2.0 ** 63
+INT64_MAX_F = float(np.nextafter(2.0 ** 63, 0))
+
+@lru_cache(maxsize=64)
+def cached_lu_factor(c_bytes, shape):
+    """LU factors of a coefficient matrix, keyed on its raw float64 bytes."""
+    C = np.frombuffer(c_bytes, dtype=np.float64).reshape(shape)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", LinAlgWarning)
+        lu, piv = lu_factor(C)
+    # lu_factor only warns on singular input; match np.linalg.solve and raise.
+    if not np.all(np.diag(lu)):
+        raise np.linalg.LinAlgError("Singular matrix")
+    return lu, piv
 
 class RatelessCoder:
-    def __init__(self, matrix_A, R):
+    def __init__(self, matrix_A, R, gpu_min_rows=None, scale_bits=Q_BITS):
         self.R = R
+        # Coded blocks are quantised to Q15 when the matrix file's scale_bits fit.
+        self.quantise = to_fixed_q15_vec if scale_bits <= Q15_BITS else to_fixed_vec
+        self.rng = np.random.default_rng()
         self.matrix_A = np.array(matrix_A)
         self.rows, self.cols = self.matrix_A.shape
         chunk_size = int(np.ceil(self.rows / R))
@@ -18,31 +44,52 @@ class RatelessCoder:
                 real_data = self.matrix_A[start:end]
                 chunk[0:real_data.shape[0], :] = real_data
             self.chunks.append(chunk)
+        self.chunks_stack = np.stack(self.chunks)
+        # GPU offload only pays for itself on large systems; the threshold comes from config.
+        self.use_gpu = cp is not None and gpu_min_rows is not None and self.rows >= gpu_min_rows
+        if self.use_gpu:
+            self.chunks_stack_dev = cp.asarray(self.chunks_stack)
 
-    def generate_task(self, x_fixed_list):
-        coeffs = np.random.randint(1, 255, size=self.R).tolist()
-        coded_matrix_block = np.zeros_like(self.chunks[0])
-        for i, c in enumerate(coeffs):
-            coded_matrix_block += c * self.chunks[i]
-
-        coded_fixed = []
-        for r in range(coded_matrix_block.shape[0]):
-            row_f = [to_fixed(val) for val in coded_matrix_block[r]]
-            coded_fixed.append(row_f)
-        return coeffs, coded_fixed
+    def generate_task(self, x_fixed):
+        """Return (coefficients, coded block) as uint8 and int32 Q1.31 (or int16 Q15) ndarrays."""
+        coeffs = self.rng.integers(1, 255, size=self.R, dtype=np.uint8)
+        if self.use_gpu:
+            coeffs_dev = cp.asarray(coeffs, dtype=cp.float64)
+            coded_matrix_block = cp.asnumpy(cp.einsum('r,rij->ij', coeffs_dev, self.chunks_stack_dev))
+        else:
+            coded_matrix_block = np.einsum('r,rij->ij', coeffs, self.chunks_stack)
+        return coeffs, self.quantise(coded_matrix_block)
 
     def decode(self, received_results):
+        decoded_chunks = self.solve(received_results)
+        if decoded_chunks is None: return None
+        # Saturate rather than let the cast wrap values beyond int64.
+        Ax = np.clip(np.rint(decoded_chunks), INT64_MIN_F, INT64_MAX_F)
+        return Ax.astype(np.int64).ravel()[:self.rows]
+
+    def solve(self, received_results):
+        """Recover the (R, chunk_size) float chunks of A*x, or None if undecodable (singular or non-finite)."""
         if len(received_results) < self.R: return None
         subset = received_results[:self.R]
-        C_matrix = np.array([item[0] for item in subset])
+        C_matrix = np.array([item[0] for item in subset], dtype=np.float64)
         Y_vector = np.array([item[1] for item in subset])
         try:
-            decoded_chunks = np.linalg.solve(C_matrix, Y_vector)
-            flat_result = []
-            for chunk_row in decoded_chunks:
-                for val in chunk_row:
-                    flat_result.append(int(round(val)))
-            return flat_result[:self.rows]
+            if self.use_gpu:
+                decoded_chunks = self._solve_gpu(C_matrix, Y_vector)
+            else:
+                lu, piv = cached_lu_factor(C_matrix.tobytes(), C_matrix.shape)
+                decoded_chunks = lu_solve((lu, piv), Y_vector, check_finite=False)
+            decoded_chunks = np.asarray(decoded_chunks, dtype=np.float64)
+            if not np.isfinite(decoded_chunks).all():
+                return None
+            return decoded_chunks
         except np.linalg.LinAlgError:
             return None
 
+
+    def _solve_gpu(self, C_matrix, Y_vector):
+        decoded = cp.linalg.solve(cp.asarray(C_matrix), cp.asarray(Y_vector, dtype=cp.float64))
+        # cuSOLVER reports singular systems as non-finite output rather than raising.
+        if not bool(cp.isfinite(decoded).all()):
+            raise np.linalg.LinAlgError("Singular matrix")
+        return cp.asnumpy(decoded)
@@ -2,14 +2,39 @@
 Q1.31 Fixed Point Arithmetic Library.
 Enforces deterministic behavior by avoiding standard floating point units.
 """
+from functools import lru_cache
+import numpy as np
+
+try:
+    from numba import njit, prange, types
+except ImportError:  # Numba is optional; the NumPy kernels below are used instead.
+    njit = None
+
 Q_BITS = 31
 MAX_INT = (1 << 31) - 1
 MIN_INT = -(1 << 31)
 
+# Q15 (int16) variant for matrices whose scale_bits fit in 15 bits. Operands are
+# quantised symmetrically to +/-Q15_MAX so no int16 x int16 product overflows.
+Q15_BITS = 15
+Q15_MAX = (1 << 15) - 1
+Q15_MIN = -(1 << 15)
+
 def to_fixed(float_val):
     raw = int(float_val * (1 << Q_BITS))
     return max(min(raw, MAX_INT), MIN_INT)
 
+def to_fixed_vec(arr):
+    """Vectorised to_fixed over an array; returns saturated Q1.31 values as int32."""
+    # Clip before the cast so out-of-range values saturate instead of wrapping.
+    scaled = np.asarray(arr, dtype=np.float64) * (1 << Q_BITS)
+    return np.clip(scaled, MIN_INT, MAX_INT).astype(np.int32)
+
+def to_fixed_q15_vec(arr):
+    """Vectorised Q15 quantisation; returns int16 saturated to +/-Q15_MAX."""
+    scaled = np.asarray(arr, dtype=np.float64) * (1 << Q15_BITS)
+    return np.clip(scaled, -Q15_MAX, Q15_MAX).astype(np.int16)
+
 def from_fixed(fixed_val):
     return fixed_val / (1 << Q_BITS)
 
@@ -22,6 +47,10 @@ def add_sat(a, b):
     return max(min(res, MAX_INT), MIN_INT)
 
 def matvec_fixed(matrix_fixed, vec_fixed):
+    if njit is not None:
+        M = np.asarray(matrix_fixed, dtype=np.int64)
+        v = np.asarray(vec_fixed, dtype=np.int64)
+        return _matvec_sat(M, v).tolist()
     rows = len(matrix_fixed)
     cols = len(matrix_fixed[0])
     result = []
@@ -33,3 +62,144 @@ def matvec_fixed(matrix_fixed, vec_fixed):
         result.append(acc)
     return result
 
+@lru_cache(maxsize=None)
+def specialized_matvec(rows, cols):
+    """matvec_fixed fully unrolled for one (rows, cols) shape, generated once per shape.
+
+    Takes and returns plain lists like matvec_fixed, with the same per-product
+    and per-accumulate saturation, but has no loops or calls; the clamps are
+    inline comparisons, which CPython runs faster than min()/max().
+    """
+    def sat(var):
+        return [f"    if {var} > {MAX_INT}: {var} = {MAX_INT}",
+                f"    elif {var} < {MIN_INT}: {var} = {MIN_INT}"]
+    name = f"matvec_{rows}x{cols}"
+    lines = [f"def {name}(M, v):",
+             "    " + "".join(f"v{c}, " for c in range(cols)) + "= v"]
+    for r in range(rows):
+        lines.append(f"    m = M[{r}]")
+        for c in range(cols):
+            lines.append(f"    p = (m[{c}] * v{c}) >> {Q_BITS}")
+            lines += sat("p")
+            if c == 0:
+                lines.append(f"    y{r} = p")
+            else:
+                lines.append(f"    y{r} += p")
+                lines += sat(f"y{r}")
+    lines.append("    return [" + ", ".join(f"y{r}" for r in range(rows)) + "]")
+    namespace = {}
+    exec(compile("\n".join(lines), f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+def matvec_fixed_np(matrix_fixed, vec_fixed):
+    """matvec_fixed on arrays; operands are widened to int64 for the multiply.
+
+    Saturates exactly like matvec_fixed: after every product (mul_sat) and every
+    accumulate (add_sat). Q1.31 operands keep every product below 2**62, so
+    int64 never wraps.
+    """
+    M = np.asarray(matrix_fixed, dtype=np.int64)
+    v = np.asarray(vec_fixed, dtype=np.int64)
+    if njit is not None:
+        return _matvec_sat(M, v)
+    prod = np.clip((M * v[None, :]) >> Q_BITS, MIN_INT, MAX_INT)
+    acc = np.zeros(M.shape[0], dtype=np.int64)
+    # Vectorised over rows; the running saturation keeps the columns sequential.
+    for c in range(prod.shape[1]):
+        acc = np.clip(acc + prod[:, c], MIN_INT, MAX_INT)
+    return acc
+
+def matvec_q15(matrix_q15, vec_q15):
+    """Q15 matvec on int16 operands: int32 products and sums, result saturated to int16.
+
+    Operands must come from to_fixed_q15_vec. Half-width lanes move a quarter of
+    the bytes of the int64 Q1.31 path and vectorise twice as wide.
+    """
+    M = np.ascontiguousarray(matrix_q15, dtype=np.int16)
+    v = np.ascontiguousarray(vec_q15, dtype=np.int16)
+    if njit is not None:
+        return _matvec_q15(M, v)
+    prod = (M.astype(np.int32) * v.astype(np.int32)[None, :]) >> Q15_BITS
+    return np.clip(prod.sum(axis=1, dtype=np.int32), Q15_MIN, Q15_MAX).astype(np.int16)
+
+def fixed_to_q15(vec_fixed):
+    """Requantise Q1.31 values to Q15 (drop the low 16 bits), saturated to +/-Q15_MAX."""
+    shifted = np.asarray(vec_fixed, dtype=np.int64) >> (Q_BITS - Q15_BITS)
+    return np.clip(shifted, -Q15_MAX, Q15_MAX).astype(np.int16)
+
+if njit is not None:
+    # The matvec kernels are nogil so callers can run them on a thread pool in parallel.
+    # Operands decoded from the wire are np.frombuffer views, which are read-only;
+    # writable arrays convert to the read-only types, so one signature covers both.
+    _MATVEC_SIG = types.int64[:](types.Array(types.int64, 2, 'A', readonly=True),
+                                 types.Array(types.int64, 1, 'A', readonly=True))
+
+    @njit(inline='always')
+    def _sat32(s):
+        """Branchless clamp of an int64 with |s| < 2**62 to the Q1.31 range.
+
+        (s - MIN_INT) >> 32 is zero exactly when s fits; folding it into a
+        0/-1 mask selects between s and the signed limit without a branch.
+        """
+        ov = (s - MIN_INT) >> 32
+        mask = (ov | -ov) >> 63
+        return (s & ~mask) | (((s >> 63) ^ MAX_INT) & mask)
+
+    @njit(_MATVEC_SIG, nogil=True, cache=True)
+    def _matvec_sat(M, v):
+        """Native matvec_fixed / matvec_fixed_np: per-product and per-accumulate saturation."""
+        rows, cols = M.shape
+        out = np.empty(rows, dtype=np.int64)
+        for r in range(rows):
+            acc = 0
+            for c in range(cols):
+                acc = _sat32(acc + _sat32((M[r, c] * v[c]) >> Q_BITS))
+            out[r] = acc
+        return out
+
+if njit is not None:
+    @njit(types.int16[:](types.Array(types.int16, 2, 'C', readonly=True),
+                         types.Array(types.int16, 1, 'C', readonly=True)), nogil=True, cache=True)
+    def _matvec_q15(M, v):
+        """Native matvec_q15; int32 accumulation vectorises to 16-bit multiply-adds."""
+        rows, cols = M.shape
+        out = np.empty(rows, dtype=np.int16)
+        for r in range(rows):
+            acc = np.int32(0)
+            for c in range(cols):
+                acc += (np.int32(M[r, c]) * np.int32(v[c])) >> np.int32(Q15_BITS)
+            out[r] = min(max(acc, Q15_MIN), Q15_MAX)
+        return out
+
+# Decoded Ax is clamped to +/-AX_LIMIT before the int64 cast. Past it, Ax + Bu
+# saturates the same way whatever Bu is, and the cast can no longer wrap.
+AX_LIMIT = float(1 << 62)
+
+def _finalize_np(decoded_chunks, B, u, rows):
+    Ax = np.clip(np.asarray(decoded_chunks).ravel()[:rows], -AX_LIMIT, AX_LIMIT)
+    Ax_next = np.rint(Ax).astype(np.int64)
+    x = Ax_next + matvec_fixed_np(B, u)
+    return np.clip(x, MIN_INT, MAX_INT).astype(np.int32)
+
+if njit is not None:
+    @njit("int32[:](float64[:, :], int32[:, :], int32[:], int64)", parallel=True, cache=True)
+    def finalize(decoded_chunks, B, u, rows):
+        """Next state from decoded chunks in one sweep: sat(rint(Ax) + matvec_fixed_np(B, u)).
+
+        decoded_chunks is the (R, chunk_size) solve output; its first `rows`
+        entries in row-major order are Ax. B and u are int32, widened to int64
+        only for the multiply.
+        """
+        chunk_size = decoded_chunks.shape[1]
+        cols = B.shape[1]
+        out = np.empty(rows, dtype=np.int32)
+        for r in prange(rows):
+            acc = np.int64(0)
+            for c in range(cols):
+                acc = _sat32(acc + _sat32((np.int64(B[r, c]) * np.int64(u[c])) >> Q_BITS))
+            d = min(max(decoded_chunks[r // chunk_size, r % chunk_size], -AX_LIMIT), AX_LIMIT)
+            ax = np.int64(np.rint(d))
+            out[r] = min(max(ax + acc, MIN_INT), MAX_INT)
+        return out
+else:
+    finalize = _finalize_np
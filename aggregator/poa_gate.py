@@ -1,23 +1,50 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
 import nacl.signing
 import nacl.encoding
 
 class PoAGate:
+    # Parsed key files shared by all gates: path -> (mtime_ns, size, by_hex).
+    # A file is re-parsed only when its mtime or size changes.
+    _key_cache = {}
+    # Verify pool shared by all gates, created on the first multi-signature batch.
+    _pool = None
+
     def __init__(self, authorized_keys_file):
-        self.verifying_keys = []
+        self.by_hex = self._load_keys(authorized_keys_file)
+
+    @classmethod
+    def _load_keys(cls, path):
+        path = os.fspath(path)
         try:
-            with open(authorized_keys_file, 'r') as f:
-                for line in f:
-                    hex_key = line.strip()
-                    if hex_key:
-                        self.verifying_keys.append(
-                            nacl.signing.VerifyKey(hex_key, encoder=nacl.encoding.HexEncoder)
-                        )
+            st = os.stat(path)
         except FileNotFoundError:
             print("WARNING: No authorized keys found. PoA will fail.")
+            return {}
+        cached = cls._key_cache.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        by_hex = {}
+        with open(path, 'r') as f:
+            for line in f:
+                hex_key = line.strip()
+                if hex_key:
+                    vk = nacl.signing.VerifyKey(hex_key, encoder=nacl.encoding.HexEncoder)
+                    by_hex[vk.encode(nacl.encoding.HexEncoder).decode()] = vk
+        cls._key_cache[path] = (st.st_mtime_ns, st.st_size, by_hex)
+        return by_hex
+
+    @classmethod
+    def _verify_pool(cls):
+        if cls._pool is None:
+            cls._pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+        return cls._pool
 
     def verify(self, message_bytes, signature_bytes, pubkey_hex):
-        vk = next((k for k in self.verifying_keys 
-                   if k.encode(nacl.encoding.HexEncoder).decode() == pubkey_hex), None)
+        return self._verify_one(message_bytes, signature_bytes, pubkey_hex)
+
+    def _verify_one(self, message_bytes, signature_bytes, pubkey_hex):
+        vk = self.by_hex.get(pubkey_hex)
         if not vk:
             return False
         try:
@@ -26,3 +53,14 @@ class PoAGate:
         except nacl.exceptions.BadSignatureError:
             return False
 
+    def verify_batch(self, messages, signatures, pubkeys_hex):
+        """Verify (message, signature, pubkey) triples; returns one bool per triple.
+
+        libsodium has no batched Ed25519 verify, so batches are spread over a
+        thread pool instead; PyNaCl drops the GIL while libsodium runs.
+        """
+        if not len(messages) == len(signatures) == len(pubkeys_hex):
+            raise ValueError("messages, signatures and pubkeys_hex must have the same length")
+        if len(messages) == 1:
+            return [self._verify_one(messages[0], signatures[0], pubkeys_hex[0])]
+        return list(self._verify_pool().map(self._verify_one, messages, signatures, pubkeys_hex))
@@ -0,0 +1,86 @@
+"""
+Proposed-state hand-off between the aggregator and operator_cli.py via shared memory.
+The segment is a tmpfs-backed file (/dev/shm where available) mapped by both sides.
+Layout (int64 words): version | seq | n | x[0..n). The version is a seqlock:
+odd while the aggregator is writing, even once the snapshot is complete.
+Kept free of package-relative imports so operator_cli.py can load it by path.
+"""
+import mmap
+import os
+import tempfile
+import numpy as np
+
+SHM_NAME = "proposed_state"
+HEADER_WORDS = 3
+
+def shm_path(name):
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, name)
+
+class ProposedStateWriter:
+    def __init__(self, n, name=SHM_NAME):
+        self.path = shm_path(name)
+        size = (HEADER_WORDS + n) * 8
+        # Build the segment, header included, under a temporary name and rename it into
+        # place, so a reader never opens it half-initialised. The rename replaces (never
+        # truncates) any segment left behind by an earlier aggregator, so a reader still
+        # mapping the old one cannot fault on a shrunken file.
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, size)
+            self.mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.words = np.ndarray(HEADER_WORDS + n, dtype=np.int64, buffer=self.mm)
+        self.words[2] = n
+        os.rename(tmp_path, self.path)
+
+    def publish(self, seq, x):
+        w = self.words
+        w[0] += 1
+        w[1] = seq
+        w[HEADER_WORDS:] = x
+        w[0] += 1
+
+    def close(self):
+        del self.words
+        self.mm.close()
+        os.unlink(self.path)
+
+class ProposedStateReader:
+    def __init__(self, name=SHM_NAME):
+        self.path = shm_path(name)
+        # Raises FileNotFoundError until the aggregator has created the segment.
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            # Our mapping keeps this inode alive, so a replacement segment gets a new one.
+            self.ino = os.fstat(fd).st_ino
+            self.mm = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        n = int(np.frombuffer(self.mm, dtype=np.int64, count=HEADER_WORDS)[2])
+        self.words = np.frombuffer(self.mm, dtype=np.int64, count=HEADER_WORDS + n)
+
+    def read(self):
+        """Return (seq, x) for a complete snapshot, or None if nothing consistent is available."""
+        w = self.words
+        version = int(w[0])
+        if version == 0 or version & 1:
+            return None
+        seq = int(w[1])
+        x = w[HEADER_WORDS:].tolist()
+        if int(w[0]) != version:
+            return None
+        return seq, x
+
+    def replaced(self):
+        """True once the mapped segment is no longer the one at the path (aggregator restarted)."""
+        try:
+            return os.stat(self.path).st_ino != self.ino
+        except FileNotFoundError:
+            return True
+
+    def close(self):
+        del self.words
+        self.mm.close()
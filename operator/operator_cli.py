@@ -1,10 +1,25 @@
 import time
-import json
+import orjson
 import nacl.signing
 import nacl.encoding
 import socket
 import cbor2
 import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'aggregator'))
+from state_shm import ProposedStateReader
+
+# A new state is noticed at most 20 ms (10 ms on average) after it is published,
+# against a 100 ms poll before; the loop stays near idle between cycles.
+POLL_INTERVAL_S = 0.02
+
+def read_state_file():
+    """Debug fallback: the aggregator only writes this file with debug_state_file enabled."""
+    if not os.path.exists("proposed_state.json"):
+        return None
+    with open("proposed_state.json", "rb") as f:
+        state = orjson.loads(f.read())
+    return state['seq'], state['x']
 
 def main():
     # Load Key
@@ -15,22 +30,28 @@ def main():
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     
     last_seq = -1
+    reader = None
     
     print("--- Edge-Lattice Operator Console ---")
     print("Waiting for proposed states...")
     
     while True:
         try:
-            if not os.path.exists("proposed_state.json"):
-                time.sleep(0.1)
-                continue
-                
-            with open("proposed_state.json", "r") as f:
-                state = json.load(f)
-            
-            if state['seq'] <= last_seq:
-                time.sleep(0.1)
+            if reader is None:
+                try:
+                    reader = ProposedStateReader()
+                except FileNotFoundError:
+                    pass
+            snapshot = reader.read() if reader is not None else read_state_file()
+            if snapshot is None or snapshot[0] <= last_seq:
+                if reader is not None and reader.replaced():
+                    # The aggregator restarted and recreated the segment; seq starts over.
+                    reader.close()
+                    reader = None
+                    last_seq = -1
+                time.sleep(POLL_INTERVAL_S)
                 continue
+            state = {"seq": snapshot[0], "x": snapshot[1]}
                 
             print(f"\n[Cycle {state['seq']}] Proposed State x: {state['x'][:3]}...")
             print("Press ENTER to Sign & Commit (or Ctrl-C to abort)...")
@@ -38,7 +59,7 @@ def main():
             time.sleep(0.05)
             
             # Sign
-            msg = str(state['seq']).encode()
+            msg = state['seq'].to_bytes(8, 'big')
             sig = signing_key.sign(msg).signature
             
             payload = {
@@ -3,7 +3,7 @@
 operator_ui.py - PyQt5-based Operator UI for AGISWARM
 
 This UI provides a graphical interface for operators to:
-- Load and sign proposed state changes
+- Load and sign the aggregator's proposed state
 - Send signed commit tokens via UDP to the aggregator
 - View the current proposed state
 
@@ -15,7 +15,9 @@ Requirements:
 Configuration:
 - UDP Target: 127.0.0.1:6000 (aggregator)
 - Operator Key: operator.sk (Ed25519 secret key, 32 bytes)
-- Proposed State: proposed_state.json (JSON format)
+- Proposed State: the aggregator's shared-memory segment (/dev/shm/proposed_state).
+  When no segment exists it falls back to proposed_state.json, which the
+  aggregator writes only with operator.debug_state_file enabled.
 
 Usage:
     python operator_ui.py
@@ -27,6 +29,9 @@ import socket
 import os
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'aggregator'))
+from state_shm import ProposedStateReader, SHM_NAME, shm_path
+
 try:
     from PyQt5.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -182,21 +187,39 @@ class OperatorUI(QMainWindow):
                 f"3. Generate a key with: python operator/keygen.py"
             )
 
+    def read_shared_state(self):
+        """Latest complete snapshot from the aggregator's shared-memory segment, or None."""
+        try:
+            reader = ProposedStateReader(SHM_NAME)
+        except FileNotFoundError:
+            return None
+        try:
+            snapshot = reader.read()
+        finally:
+            reader.close()
+        if snapshot is None:
+            return None
+        return {"seq": snapshot[0], "x": snapshot[1]}
+
     def load_proposed_state(self):
-        """Load the proposed state from JSON file."""
+        """Load the proposed state from shared memory, or from the debug JSON file."""
         try:
-            state_path = Path(self.proposed_state_path)
-            if not state_path.exists():
-                raise FileNotFoundError(f"Proposed state file not found at {self.proposed_state_path}")
-            
-            with open(state_path, "r") as f:
-                self.proposed_state = json.load(f)
+            self.proposed_state = self.read_shared_state()
+            source = shm_path(SHM_NAME)
+            if self.proposed_state is None:
+                state_path = Path(self.proposed_state_path)
+                if not state_path.exists():
+                    raise FileNotFoundError(
+                        f"No proposed state in {source} and no file at {self.proposed_state_path}")
+                with open(state_path, "r") as f:
+                    self.proposed_state = json.load(f)
+                source = self.proposed_state_path
             
             # Display the state
             formatted_state = json.dumps(self.proposed_state, indent=2)
             self.state_text.setPlainText(formatted_state)
             
-            self.log(f"✓ Proposed state loaded from {self.proposed_state_path}")
+            self.log(f"✓ Proposed state loaded from {source}")
             
             if self.signing_key:
                 self.status_label.setText("Status: Ready to sign and send")
@@ -208,7 +231,8 @@ class OperatorUI(QMainWindow):
             QMessageBox.critical(
                 self,
                 "File Not Found",
-                f"{error_msg}\n\nPlease ensure the proposed state file exists."
+                f"{error_msg}\n\nPlease ensure the aggregator is running "
+                f"(or, in debug mode, that the proposed state file exists)."
             )
         except json.JSONDecodeError as e:
             error_msg = f"Invalid JSON format in {self.proposed_state_path}: {str(e)}"
@@ -242,7 +266,7 @@ class OperatorUI(QMainWindow):
             QMessageBox.warning(
                 self,
                 "Missing State",
-                "Proposed state not loaded. Please load a proposed_state.json file."
+                "Proposed state not loaded. Please load the proposed state first."
             )
             return
         
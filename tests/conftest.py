@@ -0,0 +1,12 @@
+import pytest
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional; the async tests fall back to the stock loop.
+    uvloop = None
+
+if uvloop is not None:
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(config, item):
+        """Run the asyncio tests on uvloop's libuv loop."""
+        return {"uvloop": uvloop.new_event_loop}
@@ -0,0 +1,51 @@
+import socket
+from aggregator.batch_io import BatchSender, BatchReceiver
+
+def test_batch_sender_delivers_all():
+    receivers = []
+    for _ in range(3):
+        r = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        r.bind(('127.0.0.1', 0))
+        r.settimeout(1.0)
+        receivers.append(r)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    payloads = [b'task-%d' % i for i in range(3)]
+    addrs = [r.getsockname() for r in receivers]
+    sent = BatchSender(4).send(tx, payloads, addrs)
+    for payload, addr in zip(payloads[sent:], addrs[sent:]):
+        tx.sendto(payload, addr)
+    for r, payload in zip(receivers, payloads):
+        assert r.recv(64) == payload
+        r.close()
+    tx.close()
+
+def test_batch_receiver_drains_queue():
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(('127.0.0.1', 0))
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tx.bind(('127.0.0.1', 0))
+    for i in range(5):
+        tx.sendto(b'res-%d' % i, rx.getsockname())
+    got = BatchReceiver(capacity=8, slot_size=64).recv(rx)
+    assert [bytes(view) for view, _ in got] == [b'res-%d' % i for i in range(5)]
+    assert all(addr == tx.getsockname() for _, addr in got)
+    assert BatchReceiver(capacity=8, slot_size=64).recv(rx) == []
+    rx.close()
+    tx.close()
+
+def test_batch_receiver_reuse_across_calls():
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind(('127.0.0.1', 0))
+    receiver = BatchReceiver(capacity=4, slot_size=64)
+    for burst in (3, 0, 6):
+        tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        tx.bind(('127.0.0.1', 0))
+        for i in range(burst):
+            tx.sendto(b'%d-%d' % (burst, i), rx.getsockname())
+        # Views alias the slots, so copy them out before the next call.
+        got = [(bytes(view), addr) for view, addr in receiver.recv(rx)]
+        got += [(bytes(view), addr) for view, addr in receiver.recv(rx)]
+        assert [data for data, _ in got] == [b'%d-%d' % (burst, i) for i in range(burst)]
+        assert all(addr == tx.getsockname() for _, addr in got)
+        tx.close()
+    rx.close()
@@ -0,0 +1,55 @@
+import cbor2
+import numpy as np
+import pytest
+from aggregator.cbor_schemas import (pack_task, pack_vec, pack_ints, ResultEncoder, WIRE_DTYPE,
+                                     WIRE_DTYPE_Q15)
+
+def test_pack_task_matches_dict_encoding():
+    payload = pack_task(7, 2, [3, 5], [10, -20], [[1, 2], [3, 4]])
+    msg = cbor2.loads(payload)
+    assert list(msg) == ["t", "seq", "tid", "c", "x", "ts", "M", "rows", "cols"]
+    ts = msg["ts"]
+    expected = {"t": "TASK", "seq": 7, "tid": 2, "c": bytes([3, 5]), "x": pack_vec([10, -20]),
+                "ts": ts, "M": pack_vec([[1, 2], [3, 4]]), "rows": 2, "cols": 2}
+    assert payload == cbor2.dumps(expected)
+
+def test_pack_task_matrix_roundtrip():
+    M = np.arange(-6, 6, dtype=np.int32).reshape(3, 4) * (1 << 28)
+    msg = cbor2.loads(pack_task(1, 0, [1], pack_vec([5, 6, 7, 8]), M))
+    decoded = np.frombuffer(msg["M"], dtype=WIRE_DTYPE).reshape(msg["rows"], msg["cols"])
+    assert np.array_equal(decoded, M)
+    assert np.frombuffer(msg["x"], dtype=WIRE_DTYPE).tolist() == [5, 6, 7, 8]
+
+def test_pack_task_q15():
+    M = np.array([[1, -2, 3], [-32767, 32767, 0]], dtype=np.int16)
+    msg = cbor2.loads(pack_task(1, 0, [1], [4, 5, -6], M, scale_bits=15))
+    assert msg["sb"] == 15
+    assert len(msg["M"]) == M.size * 2
+    decoded = np.frombuffer(msg["M"], dtype=WIRE_DTYPE_Q15).reshape(msg["rows"], msg["cols"])
+    assert np.array_equal(decoded, M)
+    assert np.frombuffer(msg["x"], dtype=WIRE_DTYPE_Q15).tolist() == [4, 5, -6]
+    assert "sb" not in cbor2.loads(pack_task(1, 0, [1], [4], [[1]], scale_bits=31))
+    with pytest.raises(ValueError):
+        pack_task(1, 0, [1], [4], scale_bits=15)
+
+def test_pack_task_without_matrix():
+    msg = cbor2.loads(pack_task(1, 0, [1], [0]))
+    assert "M" not in msg
+    assert msg["t"] == "TASK" and msg["seq"] == 1
+
+def test_result_encoder_roundtrip():
+    enc = ResultEncoder(7003)
+    assert pack_ints([5, -6]) == pack_vec([5, -6])
+    for seq, tid, y in [(1, 0, [5, -6]), (2**40, 3, list(range(-20, 20)))]:
+        msg = cbor2.loads(enc.encode(seq, tid, pack_ints(y), bytes([9, 10])))
+        assert msg == {"t": "RES", "seq": seq, "tid": tid, "w": 7003, "y": pack_ints(y),
+                       "c": bytes([9, 10])}
+        assert np.frombuffer(msg["y"], dtype=WIRE_DTYPE).tolist() == y
+
+def test_result_forwards_task_coefficients_verbatim():
+    coeffs = np.arange(1, 41, dtype=np.uint8)
+    task = pack_task(3, 1, coeffs, pack_vec([1, 2]))
+    c = cbor2.loads(task)["c"]
+    res = ResultEncoder(1).encode(3, 1, pack_ints([0, 0]), c)
+    c_item = cbor2.dumps("c") + cbor2.dumps(coeffs.tobytes())
+    assert c_item in task and res.endswith(c_item)
@@ -4,7 +4,7 @@ import numpy as np
 
 def make_test_data():
     A = np.eye(4)
-    return A.tolist(), [to_fixed(x) for x in [1, 2, 3, 4]]
+    return A.tolist(), np.asarray([to_fixed(x) for x in [1, 2, 3, 4]], dtype=np.int64)
 
 def test_rateless_decode_identity():
     A, x_fixed = make_test_data()
@@ -12,9 +12,28 @@ def test_rateless_decode_identity():
     results = []
     for _ in range(2):
         coeffs, coded_block = coder.generate_task(x_fixed)
-        y_nc = np.dot(np.array(coded_block), np.array(x_fixed))
-        results.append((coeffs, y_nc.tolist()))
+        y_nc = coded_block @ x_fixed
+        results.append((coeffs, y_nc))
     out = coder.decode(results)
     assert out is not None
     assert len(out) == 4
 
+
+def test_decode_singular_coefficients():
+    coder = RatelessCoder(np.eye(4).tolist(), 2)
+    results = [([1, 2], [1, 1]), ([2, 4], [2, 2])]
+    assert coder.decode(results) is None
+
+def test_decode_saturates_out_of_range_values():
+    coder = RatelessCoder(np.eye(2).tolist(), 2)
+    # det = -1, so modest y decode to about +/-1.2e21, far beyond int64
+    C = [[254, 253], [253, 252]]
+    y = [[1.17e21 * 254 - 4.6e18 * 253], [1.17e21 * 253 - 4.6e18 * 252]]
+    out = coder.decode([(C[0], y[0]), (C[1], y[1])])
+    assert out.dtype == np.int64
+    assert out[0] > 0
+    assert out[0] == np.iinfo(np.int64).max - 1023
+
+def test_solve_rejects_non_finite():
+    coder = RatelessCoder(np.eye(2).tolist(), 2)
+    assert coder.solve([([1, 0], [np.inf]), ([0, 1], [1.0])]) is None
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from aggregator import fixed_point as fx
 
 def test_to_from_fixed():
@@ -28,3 +29,103 @@ def test_matvec_fixed():
     assert abs(fx.from_fixed(res[0])) < 1e-6
     assert abs(fx.from_fixed(res[1]) - 2.0) < 1e-6
 
+
+def test_matvec_fixed_np_matches_scalar():
+    mat = [
+        [fx.to_fixed(0.25), fx.to_fixed(-0.5), fx.to_fixed(0.125)],
+        [fx.to_fixed(0.1), fx.to_fixed(0.2), fx.to_fixed(-0.3)]
+    ]
+    vec = [fx.to_fixed(0.5), fx.to_fixed(0.25), fx.to_fixed(-1.0)]
+    assert fx.matvec_fixed_np(mat, vec).tolist() == fx.matvec_fixed(mat, vec)
+
+def test_finalize_saturates():
+    B = fx.to_fixed_vec([[0.5], [0.5], [0.5]])
+    u = fx.to_fixed_vec([0.5])
+    # Two decoded chunks of size 2; only the first three entries are state rows.
+    decoded = np.array([[fx.to_fixed(0.25) + 0.4, fx.MAX_INT], [-0.6, 123.0]])
+    out = fx.finalize(decoded, B, u, 3)
+    assert out.tolist() == [fx.to_fixed(0.5), fx.MAX_INT, fx.to_fixed(0.25) - 1]
+    assert out.tolist() == fx._finalize_np(decoded, B, u, 3).tolist()
+
+def test_finalize_clamps_huge_decoded_values():
+    B = np.array([[fx.MIN_INT], [fx.MIN_INT], [fx.MIN_INT]], dtype=np.int32)
+    u = np.array([fx.MAX_INT], dtype=np.int32)
+    # Bu is about MIN_INT per row; only the second Ax is big enough to stay saturated.
+    decoded = np.array([[fx.MAX_INT + 100.0, 1.2e21, -1.2e21]])
+    bu = fx.matvec_fixed_np(B, u)[0]
+    expected = [fx.MAX_INT + 100 + bu, fx.MAX_INT, fx.MIN_INT]
+    assert fx.finalize(decoded, B, u, 3).tolist() == expected
+    assert fx._finalize_np(decoded, B, u, 3).tolist() == expected
+
+def test_to_fixed_vec_matches_scalar():
+    vals = [0.0, 0.5, -0.5, 0.3333, -0.7777, 1.0, -1.0, 2.5, -3.0]
+    assert fx.to_fixed_vec(vals).tolist() == [fx.to_fixed(v) for v in vals]
+
+def test_matvec_fixed_saturates_each_step():
+    # Partial sums overflow and then come back down; the running saturation must be kept.
+    mat = [[fx.MAX_INT, fx.MAX_INT, fx.MIN_INT]]
+    vec = [fx.MAX_INT, fx.MAX_INT, fx.MAX_INT]
+    assert fx.matvec_fixed(mat, vec) == [0]
+
+def test_matvec_fixed_matches_scalar_saturation():
+    rng = np.random.default_rng(0)
+    mat = rng.integers(fx.MIN_INT, fx.MAX_INT, size=(8, 8), endpoint=True).tolist()
+    vec = rng.integers(fx.MIN_INT, fx.MAX_INT, size=8, endpoint=True).tolist()
+    expected = []
+    for row in mat:
+        acc = 0
+        for m, v in zip(row, vec):
+            acc = fx.add_sat(acc, fx.mul_sat(m, v))
+        expected.append(acc)
+    assert fx.matvec_fixed(mat, vec) == expected
+
+def test_matvec_fixed_np_random():
+    rng = np.random.default_rng(1)
+    M = rng.integers(fx.MIN_INT, fx.MAX_INT, size=(16, 37), endpoint=True)
+    v = rng.integers(fx.MIN_INT, fx.MAX_INT, size=37, endpoint=True)
+    assert fx.matvec_fixed_np(M, v).tolist() == fx.matvec_fixed(M.tolist(), v.tolist())
+
+def test_matvec_fixed_np_saturates_each_step():
+    mat = [[fx.MAX_INT, fx.MAX_INT, fx.MIN_INT]]
+    vec = [fx.MAX_INT, fx.MAX_INT, fx.MAX_INT]
+    assert fx.matvec_fixed_np(mat, vec).tolist() == [0]
+    # finalize's Bu uses the same rule
+    B = np.array(mat, dtype=np.int32)
+    u = np.array(vec, dtype=np.int32)
+    decoded = np.array([[0.0]])
+    assert fx.finalize(decoded, B, u, 1).tolist() == [0]
+    assert fx._finalize_np(decoded, B, u, 1).tolist() == [0]
+
+def test_matvec_q15():
+    mat = fx.to_fixed_q15_vec([[0.5, -0.5], [1.0, 1.0], [0.25, 0.25]])
+    vec = fx.to_fixed_q15_vec([1.0, 1.0])
+    res = fx.matvec_q15(mat, vec)
+    assert res.dtype == np.int16
+    assert abs(res[0]) <= 1
+    assert res[1] == fx.Q15_MAX  # 2.0 saturates
+    assert abs(res[2] / (1 << fx.Q15_BITS) - 0.5) < 1e-3
+
+def test_fixed_to_q15():
+    q31 = fx.to_fixed_vec([0.5, -0.25, 1.0, -1.0])
+    res = fx.fixed_to_q15(q31)
+    assert res.dtype == np.int16
+    assert res.tolist() == [1 << 14, -(1 << 13), fx.Q15_MAX, -fx.Q15_MAX]
+
+def test_matvec_q15_random():
+    rng = np.random.default_rng(2)
+    M = rng.integers(-fx.Q15_MAX, fx.Q15_MAX, size=(16, 40), endpoint=True).astype(np.int16)
+    v = rng.integers(-fx.Q15_MAX, fx.Q15_MAX, size=40, endpoint=True).astype(np.int16)
+    prod = (M.astype(np.int64) * v.astype(np.int64)) >> fx.Q15_BITS
+    expected = np.clip(prod.sum(axis=1), fx.Q15_MIN, fx.Q15_MAX)
+    assert fx.matvec_q15(M, v).tolist() == expected.tolist()
+
+def test_specialized_matvec_matches_matvec_fixed():
+    rng = np.random.default_rng(4)
+    for rows, cols in [(1, 1), (1, 2), (2, 2), (4, 3)]:
+        mat = rng.integers(fx.MIN_INT, fx.MAX_INT, size=(rows, cols), endpoint=True).tolist()
+        vec = rng.integers(fx.MIN_INT, fx.MAX_INT, size=cols, endpoint=True).tolist()
+        assert fx.specialized_matvec(rows, cols)(mat, vec) == fx.matvec_fixed(mat, vec)
+    assert fx.specialized_matvec(2, 2) is fx.specialized_matvec(2, 2)
+    mat = [[fx.MAX_INT, fx.MAX_INT, fx.MIN_INT]]
+    vec = [fx.MAX_INT, fx.MAX_INT, fx.MAX_INT]
+    assert fx.specialized_matvec(1, 3)(mat, vec) == [0]
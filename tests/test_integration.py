@@ -6,13 +6,34 @@ import time
 
 # Add paths for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../aggregator'))
 
 from aggregator.aggregator import Aggregator
 from worker.worker import WorkerProtocol
 
+# Event loop plus one core per worker in the largest test (N=4)
+PINNED_CORES = 5
+
+@pytest.fixture
+def pinned_cpus():
+    """Pin the test to a fixed set of cores so cycle timings do not depend on migrations.
+
+    Threads inherit the mask, so the aggregator's encode pool stays on these cores too.
+    Linux only; elsewhere the test runs unpinned.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        yield None
+        return
+    original = os.sched_getaffinity(0)
+    cores = set(sorted(original)[:PINNED_CORES])
+    os.sched_setaffinity(0, cores)
+    try:
+        yield cores
+    finally:
+        os.sched_setaffinity(0, original)
+
 @pytest.mark.asyncio
-async def test_integration_basic():
+@pytest.mark.parametrize("scale_bits", [31, 15])
+async def test_integration_basic(pinned_cpus, scale_bits):
     """Basic integration test with aggregator and workers"""
     # This test verifies basic communication between aggregator and workers
     # Uses in-memory mock to avoid file I/O issues
@@ -32,6 +53,8 @@ async def test_integration_basic():
                 'aggregator_port': 7000,
                 'worker_port_start': 7001
             },
+            # Never touch the real segment a live aggregator/operator pair may be using.
+            'operator': {'state_shm': f"test_proposed_state_{os.getpid()}_7000"},
             'simulation': {
                 'jitter_min_ms': 1,
                 'jitter_max_ms': 5,
@@ -48,7 +71,7 @@ async def test_integration_basic():
             "B": [[0.5], [0.5]],
             "x0": [1.0, 0.0],
             "u": [0.1],
-            "scale_bits": 31
+            "scale_bits": scale_bits
         }
         json.dump(matrix_data, f)
         matrix_file = f.name
@@ -67,7 +90,7 @@ async def test_integration_basic():
         workers = []
         for i in range(2):
             worker_port = 7001 + i
-            worker = WorkerProtocol(worker_port, (1, 5), 0.0)
+            worker = WorkerProtocol(worker_port, (1, 5), 0.0, compute=True)
             w_transport, _ = await loop.create_datagram_endpoint(
                 lambda w=worker: w, local_addr=('127.0.0.1', worker_port)
             )
@@ -90,6 +113,10 @@ async def test_integration_basic():
         agg_transport.close()
         for _, w_transport in workers:
             w_transport.close()
+        await asyncio.sleep(0)
+        # connection_lost released the encode pool
+        with pytest.raises(RuntimeError):
+            agg.encode_pool.submit(int)
         
     finally:
         # Clean up temp files
@@ -97,7 +124,7 @@ async def test_integration_basic():
         os.unlink(matrix_file)
 
 @pytest.mark.asyncio
-async def test_integration_with_stragglers():
+async def test_integration_with_stragglers(pinned_cpus):
     """Integration test with simulated straggler workers"""
     import tempfile
     import yaml
@@ -113,6 +140,7 @@ async def test_integration_with_stragglers():
                 'aggregator_port': 7100,
                 'worker_port_start': 7101
             },
+            'operator': {'state_shm': f"test_proposed_state_{os.getpid()}_7100"},
             'simulation': {
                 'jitter_min_ms': 5,
                 'jitter_max_ms': 50,
@@ -148,7 +176,7 @@ async def test_integration_with_stragglers():
             worker_port = 7101 + i
             # Some workers have higher failure probability (stragglers)
             fail_prob = 0.3 if i >= 2 else 0.1
-            worker = WorkerProtocol(worker_port, (10, 100), fail_prob)
+            worker = WorkerProtocol(worker_port, (10, 100), fail_prob, compute=True)
             w_transport, _ = await loop.create_datagram_endpoint(
                 lambda w=worker: w, local_addr=('127.0.0.1', worker_port)
             )
@@ -7,18 +7,21 @@ import pytest
 
 class MockLLFTNode:
     """Mock LLFT node that can act as primary or backup"""
-    def __init__(self, node_id, is_primary=False):
+    def __init__(self, node_id, is_primary=False, record_timestamps=False):
         self.id = node_id
         self.is_primary = is_primary
         self.is_alive = True
         self.message_log = []
         self.seq = 0
+        # Only stamp messages (monotonic ns) when a test inspects the timestamps
+        self.record_timestamps = record_timestamps
         
     async def send_message(self, msg):
         """Simulate sending a message if node is primary and alive"""
         if self.is_primary and self.is_alive:
             self.seq += 1
-            self.message_log.append((self.seq, msg, time.time()))
+            ts = time.monotonic_ns() if self.record_timestamps else None
+            self.message_log.append((self.seq, msg, ts))
             return True
         return False
     
@@ -130,6 +133,20 @@ async def test_llft_ordered_delivery():
     for i, (seq, msg, ts) in enumerate(backup.message_log):
         assert seq == i + 1
 
+@pytest.mark.asyncio
+async def test_llft_message_timestamps():
+    """Timestamps are recorded only on request, and never go backwards"""
+    node = MockLLFTNode("leader-1", is_primary=True, record_timestamps=True)
+    for msg in ["a", "b", "c"]:
+        await node.send_message(msg)
+    stamps = [ts for _, _, ts in node.message_log]
+    assert all(isinstance(ts, int) for ts in stamps)
+    assert stamps == sorted(stamps)
+
+    quiet = MockLLFTNode("leader-2", is_primary=True)
+    await quiet.send_message("a")
+    assert quiet.message_log == [(1, "a", None)]
+
 def test_llft_failover_demo():
     """Basic LLFT failover demonstration"""
     # Create primary and backup nodes
@@ -1,8 +1,10 @@
+import os
 import nacl.signing
+import pytest
 import nacl.encoding
 from aggregator.poa_gate import PoAGate
 
-def test_ed25519_verify():
+def test_ed25519_verify(tmp_path):
     # Generate key
     sk = nacl.signing.SigningKey.generate()
     vk = sk.verify_key
@@ -10,8 +12,69 @@ def test_ed25519_verify():
     sig = sk.sign(msg).signature
     vk_hex = vk.encode(encoder=nacl.encoding.HexEncoder).decode()
     # Save key
-    with open("/tmp/test_pubkey.txt", "w") as f:
+    key_file = tmp_path / "pubkey.txt"
+    with open(key_file, "w") as f:
         f.write(vk_hex)
-    g = PoAGate("/tmp/test_pubkey.txt")
+    g = PoAGate(key_file)
     assert g.verify(msg, sig, vk_hex)
 
+
+def test_ed25519_verify_batch_flags_bad_signature(tmp_path):
+    sk = nacl.signing.SigningKey.generate()
+    vk_hex = sk.verify_key.encode(encoder=nacl.encoding.HexEncoder).decode()
+    key_file = tmp_path / "pubkey.txt"
+    with open(key_file, "w") as f:
+        f.write(vk_hex)
+    g = PoAGate(key_file)
+    msgs = [b"m0", b"m1", b"m2"]
+    sigs = [sk.sign(m).signature for m in msgs]
+    sigs[1] = sk.sign(b"other").signature
+    assert g.verify_batch(msgs, sigs, [vk_hex] * 3) == [True, False, True]
+
+
+def test_ed25519_verify_batch(tmp_path):
+    sks = [nacl.signing.SigningKey.generate() for _ in range(4)]
+    hexes = [sk.verify_key.encode(encoder=nacl.encoding.HexEncoder).decode() for sk in sks]
+    key_file = tmp_path / "pubkey.txt"
+    with open(key_file, "w") as f:
+        f.write("\n".join(hexes))
+    g = PoAGate(key_file)
+    msgs = [i.to_bytes(8, 'big') for i in range(32)]
+    sigs = [sks[i % 4].sign(m).signature for i, m in enumerate(msgs)]
+    keys = [hexes[i % 4] for i in range(32)]
+    assert g.verify_batch(msgs, sigs, keys) == [True] * 32
+    assert g.verify_batch(msgs, sigs, keys[1:] + keys[:1]) == [False] * 32
+    assert g.verify(msgs[5], sigs[5], keys[5])
+
+
+def test_key_file_parsed_once_until_modified(tmp_path):
+    hexes = [nacl.signing.SigningKey.generate().verify_key.encode(encoder=nacl.encoding.HexEncoder).decode()
+             for _ in range(2)]
+    key_file = tmp_path / "pubkey.txt"
+    key_file.write_text(hexes[0])
+    first = PoAGate(key_file)
+    assert PoAGate(key_file).by_hex is first.by_hex
+    key_file.write_text(hexes[1])
+    st = os.stat(key_file)
+    os.utime(key_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert list(PoAGate(key_file).by_hex) == [hexes[1]]
+
+def test_verify_batch_rejects_mismatched_lengths(tmp_path):
+    key_file = tmp_path / "pubkey.txt"
+    key_file.write_text("")
+    g = PoAGate(key_file)
+    with pytest.raises(ValueError):
+        g.verify_batch([b"m0", b"m1"], [b"s0"], ["k0", "k1"])
+
+def test_gates_share_one_verify_pool(tmp_path):
+    sk = nacl.signing.SigningKey.generate()
+    vk_hex = sk.verify_key.encode(encoder=nacl.encoding.HexEncoder).decode()
+    key_file = tmp_path / "pubkey.txt"
+    key_file.write_text(vk_hex)
+    gates = [PoAGate(key_file) for _ in range(3)]
+    msgs = [b"m0", b"m1"]
+    sigs = [sk.sign(m).signature for m in msgs]
+    for g in gates:
+        assert g.verify_batch(msgs, sigs, [vk_hex] * 2) == [True, True]
+    assert "_pool" not in vars(gates[0])
+    assert PoAGate._pool is not None
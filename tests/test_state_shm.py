@@ -0,0 +1,54 @@
+import os
+import numpy as np
+from aggregator.state_shm import ProposedStateWriter, ProposedStateReader, shm_path
+
+def test_proposed_state_round_trip():
+    name = f"test_proposed_state_{os.getpid()}"
+    writer = ProposedStateWriter(3, name)
+    try:
+        reader = ProposedStateReader(name)
+        assert reader.read() is None  # nothing published yet
+        writer.publish(5, [1, -2, 3])
+        assert reader.read() == (5, [1, -2, 3])
+        writer.publish(6, [4, 5, -6])
+        assert reader.read() == (6, [4, 5, -6])
+        reader.close()
+    finally:
+        writer.close()
+
+def test_reader_detects_replaced_segment():
+    name = f"test_proposed_state_replace_{os.getpid()}"
+    writer = ProposedStateWriter(2, name)
+    writer.publish(9, [1, 2])
+    reader = ProposedStateReader(name)
+    assert not reader.replaced()
+    writer.close()
+    assert reader.replaced()
+    writer = ProposedStateWriter(2, name)
+    try:
+        writer.publish(1, [3, 4])
+        assert reader.replaced()
+        assert reader.read() == (9, [1, 2])  # still mapping the old segment
+        reader.close()
+        reader = ProposedStateReader(name)
+        assert not reader.replaced()
+        assert reader.read() == (1, [3, 4])
+        reader.close()
+    finally:
+        writer.close()
+
+def test_segment_is_initialised_before_it_appears(monkeypatch):
+    name = f"test_proposed_state_atomic_{os.getpid()}"
+    path = shm_path(name)
+    seen = []
+    rename = os.rename
+    def checking_rename(src, dst):
+        # At the moment the segment takes its final name, the header must be complete.
+        seen.append((dst, os.path.exists(dst), int(np.fromfile(src, dtype=np.int64)[2])))
+        rename(src, dst)
+    monkeypatch.setattr(os, "rename", checking_rename)
+    writer = ProposedStateWriter(4, name)
+    try:
+        assert seen == [(path, False, 4)]
+    finally:
+        writer.close()
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import sys
+import cbor2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from aggregator.cbor_schemas import pack_task, pack_vec, WIRE_DTYPE, WIRE_DTYPE_Q15
+from aggregator.fixed_point import Q15_MAX, MAX_INT, MIN_INT, matvec_fixed_np, matvec_q15
+import worker.worker as worker_mod
+from worker.worker import WorkerProtocol
+
+# Largest UDP payload over IPv4
+MAX_DATAGRAM = 65507
+
+class FakeTransport:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((data, addr))
+
+    def get_extra_info(self, name):
+        return None
+
+class Collector(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.received = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.received.put_nowait(data)
+
+def largest_square_task(rng):
+    """Random n x n TASK with the largest n whose payload still fits in one datagram."""
+    n = 1
+    while len(pack_task(4, 1, [7, 9], pack_vec(np.zeros(n + 1)), np.zeros((n + 1, n + 1)))) <= MAX_DATAGRAM:
+        n += 1
+    M = rng.integers(-(1 << 31), (1 << 31) - 1, size=(n, n))
+    x = rng.integers(-(1 << 31), (1 << 31) - 1, size=n)
+    return M, x, pack_task(4, 1, [7, 9], pack_vec(x), M)
+
+@pytest.mark.asyncio
+async def test_largest_task_over_socket():
+    M, x, payload = largest_square_task(np.random.default_rng(3))
+    assert len(payload) <= MAX_DATAGRAM
+    loop = asyncio.get_running_loop()
+    worker_t, _ = await loop.create_datagram_endpoint(
+        lambda: WorkerProtocol(9, (0, 0), 0.0), local_addr=('127.0.0.1', 0))
+    client_t, client = await loop.create_datagram_endpoint(
+        Collector, local_addr=('127.0.0.1', 0))
+    try:
+        client_t.sendto(payload, worker_t.get_extra_info('sockname'))
+        res = cbor2.loads(await asyncio.wait_for(client.received.get(), 2.0))
+    finally:
+        worker_t.close()
+        client_t.close()
+    assert (res["seq"], res["tid"], res["w"], res["c"]) == (4, 1, 9, bytes([7, 9]))
+    assert np.array_equal(np.frombuffer(res["y"], dtype=WIRE_DTYPE), matvec_fixed_np(M, x))
+
+@pytest.mark.asyncio
+async def test_placeholder_worker_skips_compute():
+    worker = WorkerProtocol(2, (0, 0), 0.0, compute=False)
+    transport = FakeTransport()
+    worker.connection_made(transport)
+    worker.dispatch(pack_task(1, 0, [1, 2], pack_vec([3, 4]), [[5, 6]]), ('127.0.0.1', 7000))
+    for _ in range(100):
+        if transport.sent:
+            break
+        await asyncio.sleep(0.005)
+    res = cbor2.loads(transport.sent[0][0])
+    assert np.frombuffer(res["y"], dtype=WIRE_DTYPE).tolist() == [10000] * 4
+
+@pytest.mark.asyncio
+async def test_bad_datagram_does_not_drop_rest_of_batch():
+    loop = asyncio.get_running_loop()
+    worker_t, _ = await loop.create_datagram_endpoint(
+        lambda: WorkerProtocol(5, (0, 0), 0.0), local_addr=('127.0.0.1', 0))
+    client_t, client = await loop.create_datagram_endpoint(
+        Collector, local_addr=('127.0.0.1', 0))
+    try:
+        # Queued back to back, so the malformed datagrams and the TASK behind them
+        # are drained in one recvmmsg batch after the first callback.
+        dest = worker_t.get_extra_info('sockname')
+        for data in (pack_task(1, 0, [1], pack_vec([2, 3]), [[4, 5]]), b"\xff", cbor2.dumps([1]),
+                     pack_task(1, 1, [1], pack_vec([2, 3]), [[4, 5]])):
+            client_t.sendto(data, dest)
+        tids = sorted([cbor2.loads(await asyncio.wait_for(client.received.get(), 2.0))["tid"]
+                       for _ in range(2)])
+    finally:
+        worker_t.close()
+        client_t.close()
+    assert tids == [0, 1]
+
+@pytest.mark.asyncio
+async def test_q15_task_uses_q15_kernel():
+    rng = np.random.default_rng(5)
+    M = rng.integers(-Q15_MAX, Q15_MAX, size=(6, 12), endpoint=True).astype(np.int16)
+    x = rng.integers(-Q15_MAX, Q15_MAX, size=12, endpoint=True).astype(np.int16)
+    worker = WorkerProtocol(3, (0, 0), 0.0)
+    transport = FakeTransport()
+    worker.connection_made(transport)
+    worker.dispatch(pack_task(1, 0, [1, 2], x, M, scale_bits=15), ('127.0.0.1', 7000))
+    for _ in range(100):
+        if transport.sent:
+            break
+        await asyncio.sleep(0.005)
+    res = cbor2.loads(transport.sent[0][0])
+    assert np.array_equal(np.frombuffer(res["y"], dtype=WIRE_DTYPE_Q15), matvec_q15(M, x))
+
+async def run_task(worker, payload):
+    """Dispatch one TASK to a worker on a FakeTransport and return the decoded y."""
+    transport = FakeTransport()
+    worker.connection_made(transport)
+    worker.dispatch(payload, ('127.0.0.1', 7000))
+    for _ in range(100):
+        if transport.sent:
+            break
+        await asyncio.sleep(0.005)
+    return np.frombuffer(cbor2.loads(transport.sent[0][0])["y"], dtype=WIRE_DTYPE).tolist()
+
+@pytest.mark.asyncio
+async def test_zero_padded_column_keeps_result():
+    # The running sum overflows and comes back; every kernel saturates each accumulate.
+    worker = WorkerProtocol(4, (0, 0), 0.0)
+    row = [MAX_INT, MAX_INT, MIN_INT]
+    for cols in range(3, 10):
+        pad = [0] * (cols - 3)
+        y = await run_task(worker, pack_task(1, 0, [1], pack_vec([MAX_INT] * 3 + pad), [row + pad]))
+        assert y == [0], cols
+
+@pytest.mark.asyncio
+async def test_4x4_task_takes_unrolled_path(monkeypatch):
+    shapes = []
+    original = worker_mod.specialized_matvec
+    def recording(rows, cols):
+        shapes.append((rows, cols))
+        return original(rows, cols)
+    monkeypatch.setattr(worker_mod, "specialized_matvec", recording)
+    rng = np.random.default_rng(6)
+    M = rng.integers(MIN_INT, MAX_INT, size=(4, 4), endpoint=True)
+    x = rng.integers(MIN_INT, MAX_INT, size=4, endpoint=True)
+    y = await run_task(WorkerProtocol(6, (0, 0), 0.0), pack_task(1, 0, [1], pack_vec(x), M))
+    assert shapes == [(4, 4)]
+    assert y == matvec_fixed_np(M, x).tolist()
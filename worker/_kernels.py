@@ -0,0 +1,17 @@
+"""
+Numba kernels for the worker hot path.
+Loaded lazily by worker.py so workers (and the test suite) run without Numba.
+"""
+import numpy as np
+from numba import njit, int64, types
+
+# x arrives as a read-only np.frombuffer view over the TASK payload.
+@njit(int64[:](int64[:], types.Array(int64, 1, 'A', readonly=True)), cache=True)
+def coded_matvec(coeffs, x):
+    """Uncoded-task fallback: every output row is sum(coeffs[c] * x[c]) over the shared prefix."""
+    acc = 0
+    for c in range(min(coeffs.size, x.size)):
+        acc += coeffs[c] * x[c]
+    out = np.empty(x.size, dtype=np.int64)
+    out[:] = acc
+    return out
@@ -1,60 +1,164 @@
 import asyncio
-import random
+import logging
+import os
+import socket
 import cbor2
+import numpy as np
 import time
 import sys
-sys.path.insert(0, '../aggregator')
-from fixed_point import matvec_fixed
+# Import the shared modules through the repo-root packages only: Numba's on-disk
+# cache records the module name, so loading aggregator/fixed_point.py as a
+# top-level `fixed_point` would break the cache for everything else.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from aggregator.fixed_point import Q_BITS, Q15_BITS, matvec_fixed, matvec_fixed_np, matvec_q15, specialized_matvec
+from aggregator.cbor_schemas import require_cbor2_c, ResultEncoder, pack_vec, pack_ints, wire_dtype, COEFF_DTYPE
+from aggregator.batch_io import BatchSender, BatchReceiver
+
+require_cbor2_c()
+
+# Below this many columns NumPy's per-call overhead outweighs the vectorised loop.
+NP_MIN_COLS = 4
+# Below this size the JIT dispatch costs more than the Python loop it replaces.
+JIT_MIN_COLS = 8
+# Tasks of at most this many elements (up to 4x4) use matvec code unrolled for
+# their exact shape, whatever their column count.
+UNROLL_MAX_ELEMS = 16
+# Room for a burst of TASKs to queue up between batched drains.
+RCVBUF_BYTES = 2 << 20
+# TASKs arriving while this many are still waiting out their jitter are dropped,
+# like any other lost packet.
+MAX_PENDING_TASKS = 256
+# Uniform draws are generated in blocks of this many and consumed one at a time.
+RAND_BLOCK = 4096
+# Fixed response of a compute=False worker (transport/timing tests only).
+PLACEHOLDER_Y = pack_ints([10000] * 4)
+
+def load_coded_matvec():
+    """Numba kernel for the uncoded fallback path, or None when Numba is unavailable.
+
+    The kernel has an explicit signature, so importing it compiles it (or loads
+    the on-disk cache) here rather than on the first task.
+    """
+    try:
+        from worker._kernels import coded_matvec
+    except ImportError:
+        return None
+    return coded_matvec
 
 class WorkerProtocol(asyncio.DatagramProtocol):
-    def __init__(self, worker_id, jitter_range, failure_prob):
+    def __init__(self, worker_id, jitter_range, failure_prob, seed=None, compute=True):
         self.id = worker_id
         self.jitter = jitter_range
         self.fail = failure_prob
+        # compute=False skips the matvec and answers every TASK with PLACEHOLDER_Y
+        self.compute = compute
+        self._rng = np.random.Generator(np.random.PCG64(seed))
+        self._rbuf = self._rng.random(RAND_BLOCK).tolist()
+        self._ridx = 0
+        self._coded_matvec = load_coded_matvec()
+        self._res = ResultEncoder(worker_id)
+        self.sock = None
+        self.sender = BatchSender(32)
+        self.receiver = BatchReceiver()
+        # Responses due in the same loop iteration go out together in one sendmmsg.
+        self._out_payloads = []
+        self._out_addrs = []
+        self._pending = 0
+        self._loop = None
 
     def connection_made(self, transport):
         self.transport = transport
+        self._loop = asyncio.get_running_loop()
+        self.sock = transport.get_extra_info('socket')
+        if self.sock is not None:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF_BYTES)
 
     def datagram_received(self, data, addr):
-        if random.random() < self.fail:
+        self.dispatch(data, addr)
+        # Drain whatever else is already queued with one recvmmsg instead of one callback each.
+        if self.sock is not None:
+            for view, src in self.receiver.recv(self.sock):
+                self.dispatch(view, src)
+
+    def _rand(self):
+        """Next uniform [0, 1) draw from the per-worker buffer."""
+        if self._ridx == RAND_BLOCK:
+            self._rbuf = self._rng.random(RAND_BLOCK).tolist()
+            self._ridx = 0
+        v = self._rbuf[self._ridx]
+        self._ridx += 1
+        return v
+
+    def dispatch(self, data, addr):
+        if self._rand() < self.fail:
             return # Simulated packet loss/crash
 
-        msg = cbor2.loads(data)
-        if msg['t'] == 'TASK':
-            asyncio.create_task(self.process_task(msg, addr))
+        try:
+            msg = cbor2.loads(data)
+            if msg['t'] == 'TASK' and self._pending < MAX_PENDING_TASKS:
+                # The jitter is a single timer entry; no coroutine or Task per TASK.
+                self._pending += 1
+                lo, hi = self.jitter
+                sleep_ms = lo + (hi - lo) * self._rand()
+                self._loop.call_later(sleep_ms / 1000.0, self._complete, msg, addr)
+        except Exception as e:
+            logging.error(f"Bad packet: {e}")
 
-    async def process_task(self, msg, addr):
-        sleep_ms = random.uniform(*self.jitter)
-        await asyncio.sleep(sleep_ms / 1000.0)
-        
+    def _complete(self, msg, addr):
+        self._pending -= 1
+        if not self.compute:
+            self.respond(msg, addr, PLACEHOLDER_Y)
+            return
         # Extract coded matrix block and x_fixed vector from the message
-        x_fixed = msg['x']
+        # Both are zero-copy (read-only) views over the packed int64 (Q15: int16) payloads
+        scale_bits = msg.get('sb', Q_BITS)
+        dtype = wire_dtype(scale_bits)
+        x_fixed = np.frombuffer(msg['x'], dtype=dtype)
         coeffs = msg['c']
         
         # Compute matrix-vector product: y = M * x
         # If coded matrix M is provided, use it; otherwise fall back to identity-like behavior
         if 'M' in msg and msg['M']:
-            coded_matrix = msg['M']
-            result_vec = matvec_fixed(coded_matrix, x_fixed)
+            coded_matrix = np.frombuffer(msg['M'], dtype=dtype).reshape(msg['rows'], msg['cols'])
+            # The Q1.31 kernels all saturate after every product and every accumulate,
+            # so the size thresholds below only choose the fastest one, never the result.
+            if scale_bits <= Q15_BITS:
+                y_bytes = pack_vec(matvec_q15(coded_matrix, x_fixed), dtype)
+            elif coded_matrix.size <= UNROLL_MAX_ELEMS:
+                matvec = specialized_matvec(*coded_matrix.shape)
+                y_bytes = pack_ints(matvec(coded_matrix.tolist(), x_fixed.tolist()))
+            elif len(x_fixed) >= NP_MIN_COLS:
+                y_bytes = pack_vec(matvec_fixed_np(coded_matrix, x_fixed))
+            else:
+                y_bytes = pack_ints(matvec_fixed(coded_matrix.tolist(), x_fixed.tolist()))
         else:
-            # Fallback for backward compatibility: simple coded computation
-            result_vec = []
-            for i in range(len(x_fixed)):
-                acc = 0
-                for c_idx, coeff in enumerate(coeffs):
-                    if c_idx < len(x_fixed):
-                        acc += coeff * x_fixed[c_idx]
-                result_vec.append(acc)
+            # Fallback for backward compatibility: simple coded computation.
+            # Every row has the same value, so the dot product is computed once.
+            if self._coded_matvec is not None and len(x_fixed) >= JIT_MIN_COLS:
+                coeffs_vec = np.frombuffer(coeffs, dtype=COEFF_DTYPE).astype(np.int64)
+                y_bytes = pack_vec(self._coded_matvec(coeffs_vec, x_fixed))
+            else:
+                # Iterating the packed uint8 coefficients yields ints directly
+                acc = sum(coeff * x for coeff, x in zip(coeffs, x_fixed.tolist()))
+                y_bytes = pack_ints([acc] * len(x_fixed))
         
-        resp = {
-            "t": "RES",
-            "seq": msg['seq'],
-            "tid": msg['tid'],
-            "w": self.id,
-            "y": result_vec,
-            "c": msg['c']
-        }
-        self.transport.sendto(cbor2.dumps(resp), addr)
+        self.respond(msg, addr, y_bytes)
+
+    def respond(self, msg, addr, y_bytes):
+        self.queue_response(self._res.encode(msg['seq'], msg['tid'], y_bytes, msg['c']), addr)
+
+    def queue_response(self, payload, addr):
+        if not self._out_payloads:
+            self._loop.call_soon(self.flush)
+        self._out_payloads.append(payload)
+        self._out_addrs.append(addr)
+
+    def flush(self):
+        payloads, addrs = self._out_payloads, self._out_addrs
+        self._out_payloads, self._out_addrs = [], []
+        sent = self.sender.send(self.sock, payloads, addrs) if self.sock is not None else 0
+        for payload, dest in zip(payloads[sent:], addrs[sent:]):
+            self.transport.sendto(payload, dest)
 
 async def main():
     port = int(sys.argv[1])